@@ -5,33 +5,31 @@ Created: 2026-01-08 16:41:04 UTC
 Author: xdexzzzkaryawan
 """
 
-import os
 import sys
-import logging
+import signal
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Optional
 
+from bot_part1 import LogConfig, MessageBus, get_env_config
+
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('bot.log'),
-        logging.StreamHandler()
-    ]
-)
-logger = logging.getLogger(__name__)
+logger = LogConfig.setup_logging('bot.log')
 
 
 class WhatsAppAppealBot:
     """Main WhatsApp Appeal Bot class for handling startup and initialization."""
     
+    # Longest the main loop blocks on the message bus before re-checking is_running
+    POLL_INTERVAL = 1.0  # seconds
+    
     def __init__(self):
         """Initialize the WhatsApp Appeal Bot."""
         self.bot_name = "WhatsApp Appeal Bot"
         self.version = "1.0.0"
         self.start_time = datetime.utcnow()
         self.is_running = False
+        self.message_bus = MessageBus()
         
         logger.info(f"Initializing {self.bot_name} v{self.version}")
     
@@ -43,10 +41,11 @@ class WhatsAppAppealBot:
             bool: True if configuration loaded successfully, False otherwise
         """
         try:
-            # Load WhatsApp API credentials from environment
-            self.whatsapp_api_key = os.getenv('WHATSAPP_API_KEY')
-            self.whatsapp_phone_number = os.getenv('WHATSAPP_PHONE_NUMBER')
-            self.database_url = os.getenv('DATABASE_URL')
+            # Load WhatsApp API credentials from the cached environment snapshot
+            env = get_env_config()
+            self.whatsapp_api_key = env.whatsapp_api_key
+            self.whatsapp_phone_number = env.whatsapp_phone_number
+            self.database_url = env.database_url
             
             if not all([self.whatsapp_api_key, self.whatsapp_phone_number]):
                 logger.warning("Missing WhatsApp configuration. Some features may not work.")
@@ -106,16 +105,23 @@ class WhatsAppAppealBot:
             if not self.load_config():
                 logger.warning("Configuration loading completed with warnings")
             
-            # Initialize database
-            if not self.initialize_database():
+            # Initialize database and handlers concurrently
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                database_future = executor.submit(self.initialize_database)
+                handlers_future = executor.submit(self.initialize_handlers)
+            
+            if not database_future.result():
                 logger.error("Failed to initialize database")
                 return False
             
-            # Initialize handlers
-            if not self.initialize_handlers():
+            if not handlers_future.result():
                 logger.error("Failed to initialize handlers")
                 return False
             
+            # Only flip the flag here: the handler runs on the main thread, which
+            # may be inside the bus's Event wait holding its lock
+            signal.signal(signal.SIGTERM, self._handle_sigterm)
+            
             self.is_running = True
             logger.info(f"{self.bot_name} is now running")
             logger.info("="*60)
@@ -125,13 +131,22 @@ class WhatsAppAppealBot:
             logger.error(f"Fatal error during startup: {e}", exc_info=True)
             return False
     
+    def _handle_sigterm(self, signum, frame) -> None:
+        """Ask the main loop to exit; noticed within POLL_INTERVAL"""
+        self.is_running = False
+    
+    def stop(self) -> None:
+        """Ask the main loop to exit and wake it if it is blocked"""
+        self.is_running = False
+        self.message_bus.close()
+    
     def shutdown(self) -> None:
         """Gracefully shutdown the bot."""
         logger.info("="*60)
         logger.info(f"Shutting down {self.bot_name}")
         logger.info("="*60)
         
-        self.is_running = False
+        self.stop()
         uptime = datetime.utcnow() - self.start_time
         logger.info(f"Bot uptime: {uptime}")
         logger.info(f"{self.bot_name} has been stopped")
@@ -145,9 +160,14 @@ class WhatsAppAppealBot:
         try:
             # Main event loop
             logger.info("Entering main event loop...")
+            # Block on the message bus, waking at least every POLL_INTERVAL
+            # so a SIGTERM is noticed even when no messages arrive
             while self.is_running:
+                message = self.message_bus.pop(timeout=self.POLL_INTERVAL)
+                if message is None:
+                    continue
                 # Event processing logic would go here
-                pass
+                logger.debug("Dispatching message %s", message.message_id)
         
         except KeyboardInterrupt:
             logger.info("Received interrupt signal")
@@ -5,36 +5,127 @@ Author: xdexzzzkaryawan
 Description: Core configuration, data models, and utility classes for WhatsApp Appeal Bot
 """
 
+import os
+import re
+import sys
+import stat
+import time
+import uuid
+import queue
+import atexit
+import threading
 import logging
+import functools
+from collections import deque
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener, RotatingFileHandler
 from enum import Enum
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
-from datetime import datetime
-import json
+from typing import Dict, List, Optional, Any, Final
+from datetime import datetime, timezone
+
+import orjson
+
+
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_PHONE_STRIP = str.maketrans('', '', '+-() ')
 
 
 # ============================================================================
 # LOGGING CONFIGURATION
 # ============================================================================
 
+class BufferedRotatingFileHandler(RotatingFileHandler):
+    """Size-rotated file handler that writes through a large buffer"""
+    
+    def __init__(self, filename: str, buffer_size: int, **kwargs):
+        self.buffer_size = buffer_size
+        self._size = 0
+        self._rotatable = True
+        super().__init__(filename, **kwargs)
+    
+    def _open(self):
+        stream = open(self.baseFilename, self.mode, buffering=self.buffer_size,
+                      encoding=self.encoding, errors=self.errors)
+        st = os.fstat(stream.fileno())
+        self._size = st.st_size
+        # Never rotate anything other than a regular file (bpo-45401)
+        self._rotatable = stat.S_ISREG(st.st_mode)
+        return stream
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        # Track the file size ourselves: the stock shouldRollover() seeks the
+        # stream and StreamHandler.emit() flushes it, both once per record
+        try:
+            msg = self.format(record) + self.terminator
+            if self.stream is None:
+                self.stream = self._open()
+            # maxBytes counts bytes on disk, not characters
+            if msg.isascii():
+                size = len(msg)
+            else:
+                size = len(msg.encode(self.stream.encoding, self.stream.errors))
+            if (self.maxBytes > 0 and self._rotatable
+                    and self._size + size >= self.maxBytes):
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+            self.stream.write(msg)
+            self._size += size
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+class BatchingMemoryHandler(MemoryHandler):
+    """Memory handler that also drains the target's write buffer on flush"""
+    
+    def flush(self) -> None:
+        with self.lock:
+            super().flush()
+            if self.target:
+                self.target.flush()
+
+
 class LogConfig:
     """Centralized logging configuration for the bot"""
     
     LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
     LOG_LEVEL = logging.INFO
+    LOG_BUFFER_SIZE = 128 * 1024  # bytes
+    LOG_BATCH_CAPACITY = 512  # records
+    LOG_MAX_BYTES = 10 * 1024 * 1024  # rotate at 10 MB
+    LOG_BACKUP_COUNT = 10
     
     @staticmethod
     def setup_logging(log_file: str = 'whatsapp_bot.log') -> logging.Logger:
         """Setup logging configuration"""
         logger = logging.getLogger('WhatsAppBot')
+        if logger.handlers:
+            # Already configured (e.g. by bot_main.py or a previous call)
+            return logger
         logger.setLevel(LogConfig.LOG_LEVEL)
+        # Records are written by our own handlers only, never again by root's
+        logger.propagate = False
         
-        # File handler
-        file_handler = logging.FileHandler(log_file)
+        # Rotating file handler, batched in memory and flushed immediately on errors
+        file_handler = BufferedRotatingFileHandler(
+            log_file,
+            LogConfig.LOG_BUFFER_SIZE,
+            maxBytes=LogConfig.LOG_MAX_BYTES,
+            backupCount=LogConfig.LOG_BACKUP_COUNT
+        )
         file_handler.setLevel(LogConfig.LOG_LEVEL)
         file_formatter = logging.Formatter(LogConfig.LOG_FORMAT, LogConfig.DATE_FORMAT)
         file_handler.setFormatter(file_formatter)
+        batch_handler = BatchingMemoryHandler(
+            capacity=LogConfig.LOG_BATCH_CAPACITY,
+            flushLevel=logging.ERROR,
+            target=file_handler
+        )
+        batch_handler.setLevel(LogConfig.LOG_LEVEL)
+        atexit.register(batch_handler.flush)
         
         # Console handler
         console_handler = logging.StreamHandler()
@@ -42,17 +133,59 @@ class LogConfig:
         console_formatter = logging.Formatter(LogConfig.LOG_FORMAT, LogConfig.DATE_FORMAT)
         console_handler.setFormatter(console_formatter)
         
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        # Callers only enqueue records; the listener thread writes them out
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, batch_handler, console_handler,
+                                 respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        
+        logger.addHandler(QueueHandler(log_queue))
         
         return logger
 
 
+# ============================================================================
+# ENVIRONMENT CONFIGURATION
+# ============================================================================
+
+@dataclass(frozen=True)
+class EnvConfig:
+    """Snapshot of the environment variables used by the bot"""
+    whatsapp_api_key: Optional[str] = None
+    whatsapp_phone_number: Optional[str] = None
+    whatsapp_business_account_id: Optional[str] = None
+    whatsapp_access_token: Optional[str] = None
+    database_url: Optional[str] = None
+
+
+@functools.lru_cache(maxsize=1)
+def get_env_config() -> EnvConfig:
+    """Read the environment once and return the cached snapshot"""
+    return EnvConfig(
+        whatsapp_api_key=os.getenv('WHATSAPP_API_KEY'),
+        whatsapp_phone_number=os.getenv('WHATSAPP_PHONE_NUMBER'),
+        whatsapp_business_account_id=os.getenv('WHATSAPP_BUSINESS_ACCOUNT_ID'),
+        whatsapp_access_token=os.getenv('WHATSAPP_ACCESS_TOKEN'),
+        database_url=os.getenv('DATABASE_URL'),
+    )
+
+
 # ============================================================================
 # ENUMERATIONS
 # ============================================================================
 
-class AppealStatus(Enum):
+class _StrValueEnum(str, Enum):
+    """str-backed enum whose str() and format() give the plain value.
+    
+    Equivalent to enum.StrEnum, which needs Python 3.11; since 3.11 a plain
+    (str, Enum) formats as 'ClassName.MEMBER' instead.
+    """
+    __str__ = str.__str__
+    __format__ = str.__format__
+
+
+class AppealStatus(_StrValueEnum):
     """Enumeration for appeal status states"""
     PENDING = "pending"
     SUBMITTED = "submitted"
@@ -62,7 +195,7 @@ class AppealStatus(Enum):
     CANCELLED = "cancelled"
 
 
-class UserRole(Enum):
+class UserRole(_StrValueEnum):
     """Enumeration for user roles in the system"""
     ADMIN = "admin"
     MODERATOR = "moderator"
@@ -70,7 +203,7 @@ class UserRole(Enum):
     GUEST = "guest"
 
 
-class MessageType(Enum):
+class MessageType(_StrValueEnum):
     """Enumeration for different message types"""
     TEXT = "text"
     IMAGE = "image"
@@ -96,7 +229,7 @@ class BotCommand(Enum):
 # DATA MODELS
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class AppealDetails:
     """Data model for appeal details"""
     appeal_id: str
@@ -105,13 +238,27 @@ class AppealDetails:
     appeal_title: str
     appeal_description: str
     appeal_category: str
-    created_at: datetime = field(default_factory=datetime.utcnow)
-    updated_at: datetime = field(default_factory=datetime.utcnow)
+    created_at: float = field(default_factory=time.time)  # epoch seconds, UTC
+    updated_at: Optional[float] = None  # defaults to created_at
     status: AppealStatus = AppealStatus.PENDING
     priority: str = "normal"
     attachments: List[str] = field(default_factory=list)
     notes: str = ""
     
+    def __post_init__(self):
+        if self.updated_at is None:
+            self.updated_at = self.created_at
+    
+    @property
+    def created_at_dt(self) -> datetime:
+        """Creation time as an aware UTC datetime"""
+        return datetime.fromtimestamp(self.created_at, tz=timezone.utc)
+    
+    @property
+    def updated_at_dt(self) -> datetime:
+        """Last update time as an aware UTC datetime"""
+        return datetime.fromtimestamp(self.updated_at, tz=timezone.utc)
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert appeal details to dictionary"""
         return {
@@ -121,9 +268,9 @@ class AppealDetails:
             'appeal_title': self.appeal_title,
             'appeal_description': self.appeal_description,
             'appeal_category': self.appeal_category,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat(),
-            'status': self.status.value,
+            'created_at': self.created_at_dt.isoformat(),
+            'updated_at': self.updated_at_dt.isoformat(),
+            'status': self.status,
             'priority': self.priority,
             'attachments': self.attachments,
             'notes': self.notes
@@ -131,10 +278,11 @@ class AppealDetails:
     
     def to_json(self) -> str:
         """Convert appeal details to JSON string"""
-        return json.dumps(self.to_dict(), indent=2)
+        # Timestamps are stored as floats, so go through to_dict() for ISO strings
+        return orjson.dumps(self.to_dict(), option=orjson.OPT_INDENT_2).decode()
 
 
-@dataclass
+@dataclass(slots=True)
 class UserProfile:
     """Data model for user profile"""
     user_id: str
@@ -142,12 +290,26 @@ class UserProfile:
     name: str
     email: Optional[str] = None
     role: UserRole = UserRole.USER
-    created_at: datetime = field(default_factory=datetime.utcnow)
-    last_active: datetime = field(default_factory=datetime.utcnow)
+    created_at: float = field(default_factory=time.time)  # epoch seconds, UTC
+    last_active: Optional[float] = None  # defaults to created_at
     is_active: bool = True
     preferences: Dict[str, Any] = field(default_factory=dict)
     appeals_count: int = 0
     
+    def __post_init__(self):
+        if self.last_active is None:
+            self.last_active = self.created_at
+    
+    @property
+    def created_at_dt(self) -> datetime:
+        """Creation time as an aware UTC datetime"""
+        return datetime.fromtimestamp(self.created_at, tz=timezone.utc)
+    
+    @property
+    def last_active_dt(self) -> datetime:
+        """Last activity time as an aware UTC datetime"""
+        return datetime.fromtimestamp(self.last_active, tz=timezone.utc)
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert user profile to dictionary"""
         return {
@@ -155,16 +317,16 @@ class UserProfile:
             'phone_number': self.phone_number,
             'name': self.name,
             'email': self.email,
-            'role': self.role.value,
-            'created_at': self.created_at.isoformat(),
-            'last_active': self.last_active.isoformat(),
+            'role': self.role,
+            'created_at': self.created_at_dt.isoformat(),
+            'last_active': self.last_active_dt.isoformat(),
             'is_active': self.is_active,
             'preferences': self.preferences,
             'appeals_count': self.appeals_count
         }
 
 
-@dataclass
+@dataclass(slots=True, eq=False, repr=False)
 class BotMessage:
     """Data model for bot messages"""
     message_id: str
@@ -172,9 +334,28 @@ class BotMessage:
     recipient_id: str
     message_text: str
     message_type: MessageType = MessageType.TEXT
-    timestamp: datetime = field(default_factory=datetime.utcnow)
+    timestamp: float = field(default_factory=time.time)  # epoch seconds, UTC
     is_read: bool = False
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    metadata: Optional[Dict[str, Any]] = None  # created on first set_metadata()
+    
+    def __post_init__(self):
+        # Sender/recipient IDs repeat across many queued messages; share one copy
+        self.sender_id = sys.intern(self.sender_id)
+        self.recipient_id = sys.intern(self.recipient_id)
+    
+    def __repr__(self) -> str:
+        return f"BotMessage(message_id={self.message_id!r})"
+    
+    @property
+    def timestamp_dt(self) -> datetime:
+        """Message time as an aware UTC datetime"""
+        return datetime.fromtimestamp(self.timestamp, tz=timezone.utc)
+    
+    def set_metadata(self, key: str, value: Any) -> None:
+        """Set a metadata entry, creating the metadata dict on first use"""
+        if self.metadata is None:
+            self.metadata = {}
+        self.metadata[key] = value
     
     def mark_as_read(self) -> None:
         """Mark message as read"""
@@ -187,10 +368,10 @@ class BotMessage:
             'sender_id': self.sender_id,
             'recipient_id': self.recipient_id,
             'message_text': self.message_text,
-            'message_type': self.message_type.value,
-            'timestamp': self.timestamp.isoformat(),
+            'message_type': self.message_type,
+            'timestamp': self.timestamp_dt.isoformat(),
             'is_read': self.is_read,
-            'metadata': self.metadata
+            'metadata': self.metadata if self.metadata is not None else {}
         }
 
 
@@ -232,7 +413,7 @@ class BotConfig:
     MAX_MESSAGE_LENGTH = 4096
     
     # Appeal Configuration
-    APPEAL_CATEGORIES = [
+    APPEAL_CATEGORIES = (
         "Technical Issue",
         "Account Problem",
         "Payment Issue",
@@ -240,9 +421,13 @@ class BotConfig:
         "Complaint",
         "Suggestion",
         "Other"
-    ]
+    )
     
-    APPEAL_PRIORITIES = ["low", "normal", "high", "urgent"]
+    APPEAL_PRIORITIES = ("low", "normal", "high", "urgent")
+    
+    # Set views of the above for membership checks; the tuples keep display order
+    APPEAL_CATEGORY_SET = frozenset(APPEAL_CATEGORIES)
+    APPEAL_PRIORITY_SET = frozenset(APPEAL_PRIORITIES)
     
     # Rate Limiting
     RATE_LIMIT_ENABLED = True
@@ -258,39 +443,71 @@ class BotConfig:
         'error': "An error occurred. Please try again later.",
     }
     
+    # Templates without placeholders; render() returns these without formatting
+    _STATIC_TEMPLATES = frozenset(
+        key for key, template in RESPONSE_TEMPLATES.items()
+        if '{' not in template and '}' not in template
+    )
+    
     # Timezone
     TIMEZONE = "UTC"
     
     # Debug Mode
     DEBUG_MODE = False
     
+    # Memoized result of to_dict(); cleared by reset_cache()
+    _DICT_CACHE: Optional[Dict[str, Any]] = None
+    
+    @classmethod
+    def load_from_env(cls) -> None:
+        """Populate the environment-backed settings from the cached snapshot"""
+        env = get_env_config()
+        cls.WHATSAPP_PHONE_NUMBER = env.whatsapp_phone_number
+        cls.WHATSAPP_BUSINESS_ACCOUNT_ID = env.whatsapp_business_account_id
+        cls.WHATSAPP_ACCESS_TOKEN = env.whatsapp_access_token
+        cls.reset_cache()
+    
+    @classmethod
+    def render(cls, key: str, **kwargs) -> str:
+        """Render a response template, falling back to the error template"""
+        if key not in cls.RESPONSE_TEMPLATES:
+            key = 'error'
+        template = cls.RESPONSE_TEMPLATES[key]
+        if key in cls._STATIC_TEMPLATES:
+            return template
+        try:
+            return template.format_map(kwargs)
+        except KeyError:
+            return template
+    
     @classmethod
     def to_dict(cls) -> Dict[str, Any]:
-        """Convert config to dictionary"""
-        return {
-            'bot_name': cls.BOT_NAME,
-            'bot_version': cls.BOT_VERSION,
-            'bot_description': cls.BOT_DESCRIPTION,
-            'api_timeout': cls.API_TIMEOUT,
-            'max_retries': cls.MAX_RETRIES,
-            'database_type': cls.DATABASE_TYPE,
-            'message_queue_size': cls.MESSAGE_QUEUE_SIZE,
-            'rate_limit_enabled': cls.RATE_LIMIT_ENABLED,
-            'debug_mode': cls.DEBUG_MODE,
-        }
+        """Convert config to dictionary (cached; treat the result as read-only)"""
+        if cls._DICT_CACHE is None:
+            cls._DICT_CACHE = {
+                'bot_name': cls.BOT_NAME,
+                'bot_version': cls.BOT_VERSION,
+                'bot_description': cls.BOT_DESCRIPTION,
+                'api_timeout': cls.API_TIMEOUT,
+                'max_retries': cls.MAX_RETRIES,
+                'database_type': cls.DATABASE_TYPE,
+                'message_queue_size': cls.MESSAGE_QUEUE_SIZE,
+                'rate_limit_enabled': cls.RATE_LIMIT_ENABLED,
+                'debug_mode': cls.DEBUG_MODE,
+            }
+        return cls._DICT_CACHE
+    
+    @classmethod
+    def reset_cache(cls) -> None:
+        """Drop the cached to_dict() result after changing settings"""
+        cls._DICT_CACHE = None
 
 
 # ============================================================================
 # UTILITY CLASSES
 # ============================================================================
 
-class MessageBuilder:
-    """Utility class for building formatted messages"""
-    
-    @staticmethod
-    def build_menu_message() -> str:
-        """Build main menu message"""
-        menu = """
+_MENU_MESSAGE: Final[str] = """
 📋 *Main Menu*
 
 1️⃣ Submit Appeal - /appeal
@@ -299,13 +516,9 @@ class MessageBuilder:
 4️⃣ Settings - /settings
 
 Type the command or number to proceed.
-        """
-        return menu.strip()
-    
-    @staticmethod
-    def build_help_message() -> str:
-        """Build help message"""
-        help_text = """
+""".strip()
+
+_HELP_MESSAGE: Final[str] = """
 🆘 *Available Commands*
 
 /start - Start the bot
@@ -317,13 +530,9 @@ Type the command or number to proceed.
 /cancel - Cancel current operation
 
 For more information, type /menu
-        """
-        return help_text.strip()
-    
-    @staticmethod
-    def build_appeal_form() -> str:
-        """Build appeal submission form"""
-        form = """
+""".strip()
+
+_APPEAL_FORM: Final[str] = """
 📝 *Submit Your Appeal*
 
 Please provide the following information:
@@ -334,8 +543,26 @@ Please provide the following information:
 4. *Attachments* (Optional) - Upload documents/images
 
 What would you like to report?
-        """
-        return form.strip()
+""".strip()
+
+
+class MessageBuilder:
+    """Utility class for building formatted messages"""
+    
+    @staticmethod
+    def build_menu_message() -> str:
+        """Build main menu message"""
+        return _MENU_MESSAGE
+    
+    @staticmethod
+    def build_help_message() -> str:
+        """Build help message"""
+        return _HELP_MESSAGE
+    
+    @staticmethod
+    def build_appeal_form() -> str:
+        """Build appeal submission form"""
+        return _APPEAL_FORM
     
     @staticmethod
     def format_appeal_summary(appeal: AppealDetails) -> str:
@@ -346,9 +573,9 @@ What would you like to report?
 ID: {appeal.appeal_id}
 Title: {appeal.appeal_title}
 Category: {appeal.appeal_category}
-Status: {appeal.status.value.upper()}
+Status: {appeal.status.upper()}
 Priority: {appeal.priority.upper()}
-Created: {appeal.created_at.strftime('%Y-%m-%d %H:%M:%S')}
+Created: {appeal.created_at_dt.strftime('%Y-%m-%d %H:%M:%S')}
 
 Description:
 {appeal.appeal_description}
@@ -363,16 +590,24 @@ class ValidationHelper:
     def is_valid_phone_number(phone: str) -> bool:
         """Validate phone number format"""
         # Remove common formatting characters
-        cleaned = phone.replace('+', '').replace('-', '').replace(' ', '').replace('(', '').replace(')', '')
+        cleaned = phone.translate(_PHONE_STRIP)
         # Check if it's numeric and reasonable length
         return cleaned.isdigit() and 10 <= len(cleaned) <= 15
     
     @staticmethod
     def is_valid_email(email: str) -> bool:
         """Validate email format"""
-        import re
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(pattern, email) is not None
+        return _EMAIL_RE.match(email) is not None
+    
+    @staticmethod
+    def is_valid_appeal_category(category: str) -> bool:
+        """Validate appeal category"""
+        return category in BotConfig.APPEAL_CATEGORY_SET
+    
+    @staticmethod
+    def is_valid_appeal_priority(priority: str) -> bool:
+        """Validate appeal priority"""
+        return priority in BotConfig.APPEAL_PRIORITY_SET
     
     @staticmethod
     def is_valid_appeal_title(title: str) -> bool:
@@ -388,24 +623,22 @@ class ValidationHelper:
 class IDGenerator:
     """Utility class for generating unique IDs"""
     
-    import uuid
-    
     @staticmethod
     def generate_appeal_id() -> str:
         """Generate unique appeal ID"""
-        timestamp = datetime.utcnow().strftime('%Y%m%d%H%M%S')
-        random_suffix = str(IDGenerator.uuid.uuid4())[:8].upper()
+        timestamp = time.strftime('%Y%m%d%H%M%S', time.gmtime())
+        random_suffix = uuid.uuid4().hex[:8].upper()
         return f"APPEAL-{timestamp}-{random_suffix}"
     
     @staticmethod
     def generate_user_id() -> str:
         """Generate unique user ID"""
-        return f"USER-{IDGenerator.uuid.uuid4()}"
+        return f"USER-{uuid.uuid4().hex}"
     
     @staticmethod
     def generate_message_id() -> str:
         """Generate unique message ID"""
-        return f"MSG-{IDGenerator.uuid.uuid4()}"
+        return f"MSG-{uuid.uuid4().hex}"
 
 
 class ErrorHandler:
@@ -442,6 +675,57 @@ class ErrorHandler:
             return "An unexpected error occurred. Please try again later."
 
 
+# ============================================================================
+# MESSAGE BUS
+# ============================================================================
+
+class MessageBus:
+    """Bounded message buffer for many producers and a single consumer.
+    
+    When full, pushing a new message silently drops the oldest one.
+    """
+    
+    def __init__(self, maxlen: Optional[int] = None):
+        # deque.append/popleft are atomic, so no lock is needed around them
+        self._messages: deque = deque(maxlen=maxlen or BotConfig.MESSAGE_QUEUE_SIZE)
+        self._not_empty = threading.Event()
+        self._closed = False
+    
+    def __len__(self) -> int:
+        return len(self._messages)
+    
+    def push(self, message: BotMessage) -> None:
+        """Add a message and wake the consumer"""
+        self._messages.append(message)
+        self._not_empty.set()
+    
+    def pop(self, timeout: Optional[float] = None) -> Optional[BotMessage]:
+        """
+        Remove and return the oldest message, blocking while the bus is empty.
+        
+        Returns:
+            BotMessage, or None on timeout or once the bus is closed and drained
+        """
+        while True:
+            try:
+                return self._messages.popleft()
+            except IndexError:
+                pass
+            if self._closed:
+                return None
+            self._not_empty.clear()
+            # A push() or close() may have landed between popleft() and clear()
+            if self._messages or self._closed:
+                continue
+            if not self._not_empty.wait(timeout):
+                return None
+    
+    def close(self) -> None:
+        """Wake a blocked consumer; pop() returns None once drained"""
+        self._closed = True
+        self._not_empty.set()
+
+
 # ============================================================================
 # INITIALIZATION
 # ============================================================================
@@ -449,8 +733,10 @@ class ErrorHandler:
 def initialize_bot() -> logging.Logger:
     """Initialize bot with logging and configuration"""
     logger = LogConfig.setup_logging()
+    BotConfig.load_from_env()
     logger.info(f"Initializing {BotConfig.BOT_NAME} v{BotConfig.BOT_VERSION}")
-    logger.info(f"Configuration: {json.dumps(BotConfig.to_dict(), indent=2)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Configuration: %s", BotConfig.to_dict())
     return logger
 
 
@@ -4,13 +4,18 @@ Handles advanced message processing, appeal management, and user interactions
 Created: 2026-01-08 16:40:27 UTC
 """
 
-import json
+import time
+import itertools
+import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Deque, Dict, Iterator, List, Optional, Tuple, Union
+from dataclasses import dataclass
 from enum import Enum
 import re
+from collections import deque
+
+import orjson
 
 # Configure logging
 logging.basicConfig(
@@ -20,6 +25,50 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# (epoch seconds, ISO string) of the last now_iso() computation
+_now_cache: Tuple[float, str] = (0.0, "")
+
+
+def now_iso() -> str:
+    """
+    Current UTC time as an ISO 8601 string
+    
+    Calls within the same millisecond reuse the previously formatted value,
+    so a burst of state updates for one message formats the time only once.
+    """
+    global _now_cache
+    now = time.time()
+    cached_at, cached = _now_cache
+    if 0 <= now - cached_at < 0.001:
+        return cached
+    cached = datetime.fromtimestamp(now, tz=timezone.utc).isoformat()
+    _now_cache = (now, cached)
+    return cached
+
+
+# Keywords signalling each intent, checked in this order by process_text
+_INTENT_PATTERNS: Dict[str, Tuple[str, ...]] = {
+    'create_appeal': ('appeal', 'complain', 'report', 'create', 'new'),
+    'check_status': ('status', 'check', 'progress', 'update'),
+    'provide_info': ('provide', 'here', 'attached', 'additional'),
+    'escalate': ('escalate', 'urgent', 'critical', 'manager'),
+    'close_appeal': ('close', 'done', 'resolve', 'finish'),
+    'get_help': ('help', 'guide', 'how', 'assist'),
+    'cancel': ('cancel', 'never mind', 'discard', 'exit'),
+}
+
+
+# Appeal categories recognised in free text, first match wins
+_CATEGORIES: Tuple[str, ...] = ('account', 'billing', 'technical', 'service', 'other')
+
+# Words raising or lowering an appeal's priority; high wins over low
+_HIGH_PRIORITY_WORDS: Tuple[str, ...] = ('urgent', 'critical', 'high')
+_LOW_PRIORITY_WORDS: Tuple[str, ...] = ('low', 'whenever')
+
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+_PHONE_RE = re.compile(r'\b(?:\+62|0)[0-9]{9,}\b')
+
+
 class AppealStatus(Enum):
     """Appeal status enumeration"""
     PENDING = "pending"
@@ -41,7 +90,13 @@ class MessageType(Enum):
     CONTACT = "contact"
 
 
-@dataclass
+# Plain string values of the enums above, read without going through Enum.value
+_STATUS_STR: Dict[AppealStatus, str] = {status: status.value for status in AppealStatus}
+_TEXT_TYPE = MessageType.TEXT.value
+_IMAGE_TYPE = MessageType.IMAGE.value
+
+
+@dataclass(slots=True)
 class UserProfile:
     """User profile data structure"""
     user_id: str
@@ -55,12 +110,12 @@ class UserProfile:
 
     def __post_init__(self):
         if self.created_at is None:
-            self.created_at = datetime.utcnow().isoformat()
+            self.created_at = now_iso()
         if self.last_interaction is None:
-            self.last_interaction = datetime.utcnow().isoformat()
+            self.last_interaction = now_iso()
 
 
-@dataclass
+@dataclass(slots=True)
 class Appeal:
     """Appeal data structure"""
     appeal_id: str
@@ -81,19 +136,40 @@ class Appeal:
         if self.attachments is None:
             self.attachments = []
         if self.created_at is None:
-            self.created_at = datetime.utcnow().isoformat()
+            self.created_at = now_iso()
         if self.updated_at is None:
-            self.updated_at = datetime.utcnow().isoformat()
+            self.updated_at = now_iso()
         if self.notes is None:
             self.notes = []
 
 
+def _json_default(obj):
+    """Fallback for values orjson cannot serialize natively"""
+    return str(obj)
+
+
+def dump_appeal(record: Union[Appeal, UserProfile]) -> bytes:
+    """
+    Serialize an Appeal or UserProfile to JSON bytes
+    
+    orjson encodes slotted dataclasses and enums natively, so records are
+    passed straight through without an intermediate asdict() copy.
+    """
+    return orjson.dumps(record, default=_json_default)
+
+
 class MessageHandler:
     """Handles incoming and outgoing messages"""
 
+    # Pending messages; enqueue() waits for space once the queue is full
+    MAX_QUEUED_MESSAGES = 1024
+    # Processed messages kept for inspection; older ones are dropped
+    MAX_PROCESSED_MESSAGES = 10000
+
     def __init__(self):
-        self.message_queue: List[Dict] = []
-        self.processed_messages: List[Dict] = []
+        # Not thread-safe: use from the thread running the event loop
+        self.message_queue: asyncio.Queue = asyncio.Queue(maxsize=self.MAX_QUEUED_MESSAGES)
+        self.processed_messages: Deque[Dict] = deque(maxlen=self.MAX_PROCESSED_MESSAGES)
 
     def parse_message(self, raw_message: Dict) -> Dict:
         """
@@ -109,8 +185,8 @@ class MessageHandler:
             parsed = {
                 'message_id': raw_message.get('id'),
                 'from_number': raw_message.get('from'),
-                'timestamp': raw_message.get('timestamp', datetime.utcnow().isoformat()),
-                'type': MessageType.TEXT.value,
+                'timestamp': raw_message.get('timestamp', now_iso()),
+                'type': _TEXT_TYPE,
                 'content': raw_message.get('body', ''),
                 'media': None,
                 'processed': False
@@ -118,19 +194,23 @@ class MessageHandler:
 
             # Handle different message types
             if 'media' in raw_message:
-                parsed['type'] = raw_message['media'].get('type', MessageType.IMAGE.value)
+                parsed['type'] = raw_message['media'].get('type', _IMAGE_TYPE)
                 parsed['media'] = raw_message['media']
 
-            logger.info(f"Message parsed: {parsed['message_id']}")
+            logger.debug("Message parsed: %s", parsed['message_id'])
             return parsed
 
         except Exception as e:
-            logger.error(f"Error parsing message: {str(e)}")
+            logger.error("Error parsing message: %s", e)
             return None
 
-    def extract_intent(self, message_content: str) -> Tuple[str, Dict]:
+    def process_text(self, message_content: str) -> Tuple[str, Dict]:
         """
-        Extract user intent and parameters from message
+        Detect intent and extract parameters from message text
+        
+        The text is lowercased once and shared by every keyword check. Intents
+        are tried in order and checking stops at the first one that matches,
+        so later intents' keywords are never searched for.
         
         Args:
             message_content: Message text content
@@ -140,39 +220,42 @@ class MessageHandler:
         """
         content_lower = message_content.lower().strip()
 
-        # Define intent patterns
-        intent_patterns = {
-            'create_appeal': [r'appeal', r'complain', r'report', r'create', r'new'],
-            'check_status': [r'status', r'check', r'progress', r'update'],
-            'provide_info': [r'provide', r'here', r'attached', r'additional'],
-            'escalate': [r'escalate', r'urgent', r'critical', r'manager'],
-            'close_appeal': [r'close', r'done', r'resolve', r'finish'],
-            'get_help': [r'help', r'guide', r'how', r'assist'],
-            'cancel': [r'cancel', r'never mind', r'discard', r'exit']
-        }
-
         detected_intent = 'unknown'
         confidence = 0.0
 
-        for intent, patterns in intent_patterns.items():
-            matches = sum(1 for pattern in patterns if re.search(pattern, content_lower))
+        for intent, patterns in _INTENT_PATTERNS.items():
+            matches = sum(1 for pattern in patterns if pattern in content_lower)
             if matches > 0:
                 confidence = matches / len(patterns)
                 if confidence > 0.3:
                     detected_intent = intent
                     break
 
-        parameters = self._extract_parameters(message_content, detected_intent)
+        parameters = self._extract_parameters(message_content, detected_intent, content_lower)
 
         return detected_intent, parameters
 
-    def _extract_parameters(self, message_content: str, intent: str) -> Dict:
+    def extract_intent(self, message_content: str) -> Tuple[str, Dict]:
+        """
+        Extract user intent and parameters from message
+        
+        Args:
+            message_content: Message text content
+            
+        Returns:
+            Tuple of (intent, parameters), as returned by process_text
+        """
+        return self.process_text(message_content)
+
+    def _extract_parameters(self, message_content: str, intent: str,
+                            content_lower: str) -> Dict:
         """
         Extract parameters from message based on intent
         
         Args:
             message_content: Message text
             intent: Detected intent
+            content_lower: Lowercased message text, as computed by process_text
             
         Returns:
             Dictionary of extracted parameters
@@ -180,49 +263,113 @@ class MessageHandler:
         params = {}
 
         # Extract email if present
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, message_content)
-        if emails:
-            params['email'] = emails[0]
+        email = _EMAIL_RE.search(message_content)
+        if email:
+            params['email'] = email.group()
 
         # Extract phone numbers
-        phone_pattern = r'\b(?:\+62|0)[0-9]{9,}\b'
-        phones = re.findall(phone_pattern, message_content)
-        if phones:
-            params['phone'] = phones[0]
+        phone = _PHONE_RE.search(message_content)
+        if phone:
+            params['phone'] = phone.group()
 
         # Extract category keywords
-        categories = ['account', 'billing', 'technical', 'service', 'other']
-        for category in categories:
-            if category in message_content.lower():
-                params['category'] = category
-                break
+        category = next((c for c in _CATEGORIES if c in content_lower), None)
+        if category:
+            params['category'] = category
 
         # Extract priority
-        if any(word in message_content.lower() for word in ['urgent', 'critical', 'high']):
+        if any(word in content_lower for word in _HIGH_PRIORITY_WORDS):
             params['priority'] = 'high'
-        elif any(word in message_content.lower() for word in ['low', 'whenever']):
+        elif any(word in content_lower for word in _LOW_PRIORITY_WORDS):
             params['priority'] = 'low'
         else:
             params['priority'] = 'normal'
 
         return params
 
-    def queue_message(self, message: Dict) -> None:
-        """Queue message for processing"""
-        self.message_queue.append(message)
-        logger.info(f"Message queued: {message.get('message_id')}")
+    def queue_message(self, message: Dict) -> bool:
+        """Queue message for processing without waiting; returns False if full"""
+        try:
+            self.message_queue.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning("Message queue full, dropping: %s", message.get('message_id'))
+            return False
+        logger.debug("Message queued: %s", message.get('message_id'))
+        return True
+
+    async def enqueue(self, message: Dict) -> None:
+        """Queue message for processing, waiting while the queue is full"""
+        await self.message_queue.put(message)
+        logger.debug("Message queued: %s", message.get('message_id'))
 
     def dequeue_and_process(self) -> Optional[Dict]:
         """Dequeue and process next message"""
-        if not self.message_queue:
+        try:
+            message = self.message_queue.get_nowait()
+        except asyncio.QueueEmpty:
             return None
 
-        message = self.message_queue.pop(0)
+        self._mark_processed(message)
+        logger.debug("Message processed: %s", message.get('message_id'))
+        return message
+
+    def dequeue_and_process_batch(self, max_n: int = 256) -> List[Dict]:
+        """
+        Dequeue and process up to max_n messages in one call
+        
+        Args:
+            max_n: Maximum number of messages to take from the queue
+            
+        Returns:
+            List of processed messages, oldest first (empty if queue is empty)
+        """
+        queue = self.message_queue
+        batch = [queue.get_nowait() for _ in range(min(max_n, queue.qsize()))]
+        if not batch:
+            return batch
+
+        for message in batch:
+            self._mark_processed(message)
+        logger.info("Batch processed: %d messages", len(batch))
+        return batch
+
+    async def worker(self, handler: Callable[[Dict], Awaitable[None]]) -> None:
+        """
+        Consume queued messages forever, awaiting handler for each one
+        
+        Args:
+            handler: Coroutine function called with each dequeued message
+        """
+        while True:
+            message = await self.message_queue.get()
+            try:
+                await handler(message)
+                message['processed'] = True
+                self.processed_messages.append(message)
+            except Exception as e:
+                logger.error("Error handling message %s: %s", message.get('message_id'), e)
+            finally:
+                self.message_queue.task_done()
+
+    def start_workers(self, handler: Callable[[Dict], Awaitable[None]],
+                      concurrency: int = 4) -> List[asyncio.Task]:
+        """
+        Spawn worker tasks on the running event loop
+        
+        Args:
+            handler: Coroutine function called with each dequeued message
+            concurrency: Number of messages handled at the same time
+            
+        Returns:
+            The worker tasks; cancel them to stop consuming
+        """
+        return [asyncio.create_task(self.worker(handler)) for _ in range(concurrency)]
+
+    def _mark_processed(self, message: Dict) -> None:
+        """Record a message taken off the queue synchronously as processed"""
         message['processed'] = True
         self.processed_messages.append(message)
-        logger.info(f"Message processed: {message.get('message_id')}")
-        return message
+        self.message_queue.task_done()
 
 
 class AppealManager:
@@ -230,7 +377,13 @@ class AppealManager:
 
     def __init__(self):
         self.appeals: Dict[str, Appeal] = {}
-        self.user_appeals: Dict[str, List[str]] = {}
+        self.user_appeals: Dict[str, List[Appeal]] = {}
+        # Appeal IDs grouped by current status, kept in sync by _set_status;
+        # dicts with None values serve as insertion-ordered sets
+        self.by_status: Dict[AppealStatus, Dict[str, None]] = {status: {} for status in AppealStatus}
+        self._appeal_counter = itertools.count(1)
+        # (epoch second, formatted timestamp) reused within the same second
+        self._timestamp_cache: Tuple[int, str] = (-1, "")
 
     def create_appeal(self, user_id: str, category: str, subject: str, 
                      description: str, priority: str = "normal") -> Appeal:
@@ -260,15 +413,14 @@ class AppealManager:
 
             self.appeals[appeal_id] = appeal
 
-            if user_id not in self.user_appeals:
-                self.user_appeals[user_id] = []
-            self.user_appeals[user_id].append(appeal_id)
+            self.user_appeals.setdefault(user_id, []).append(appeal)
+            self.by_status[appeal.status][appeal_id] = None
 
-            logger.info(f"Appeal created: {appeal_id} for user {user_id}")
+            logger.info("Appeal created: %s for user %s", appeal_id, user_id)
             return appeal
 
         except Exception as e:
-            logger.error(f"Error creating appeal: {str(e)}")
+            logger.error("Error creating appeal: %s", e)
             return None
 
     def update_appeal_status(self, appeal_id: str, status: AppealStatus, 
@@ -286,12 +438,12 @@ class AppealManager:
         """
         try:
             if appeal_id not in self.appeals:
-                logger.warning(f"Appeal not found: {appeal_id}")
+                logger.warning("Appeal not found: %s", appeal_id)
                 return False
 
             appeal = self.appeals[appeal_id]
-            appeal.status = status
-            appeal.updated_at = datetime.utcnow().isoformat()
+            self._set_status(appeal, status)
+            appeal.updated_at = now_iso()
 
             if notes:
                 appeal.notes.append({
@@ -299,11 +451,11 @@ class AppealManager:
                     'content': notes
                 })
 
-            logger.info(f"Appeal {appeal_id} status updated to {status.value}")
+            logger.info("Appeal %s status updated to %s", appeal_id, _STATUS_STR[status])
             return True
 
         except Exception as e:
-            logger.error(f"Error updating appeal status: {str(e)}")
+            logger.error("Error updating appeal status: %s", e)
             return False
 
     def get_appeal(self, appeal_id: str) -> Optional[Appeal]:
@@ -311,9 +463,13 @@ class AppealManager:
         return self.appeals.get(appeal_id)
 
     def get_user_appeals(self, user_id: str) -> List[Appeal]:
-        """Retrieve all appeals for a user"""
-        appeal_ids = self.user_appeals.get(user_id, [])
-        return [self.appeals[aid] for aid in appeal_ids if aid in self.appeals]
+        """Retrieve all appeals for a user (the live list; do not modify)"""
+        return self.user_appeals.get(user_id, [])
+
+    def get_appeals_by_status(self, status: AppealStatus) -> Iterator[Appeal]:
+        """Iterate over appeals in the given status, in the order they entered it"""
+        appeals = self.appeals
+        return (appeals[appeal_id] for appeal_id in tuple(self.by_status[status]))
 
     def add_attachment(self, appeal_id: str, attachment_url: str) -> bool:
         """Add attachment to appeal"""
@@ -322,12 +478,12 @@ class AppealManager:
                 return False
 
             self.appeals[appeal_id].attachments.append(attachment_url)
-            self.appeals[appeal_id].updated_at = datetime.utcnow().isoformat()
-            logger.info(f"Attachment added to appeal {appeal_id}")
+            self.appeals[appeal_id].updated_at = now_iso()
+            logger.info("Attachment added to appeal %s", appeal_id)
             return True
 
         except Exception as e:
-            logger.error(f"Error adding attachment: {str(e)}")
+            logger.error("Error adding attachment: %s", e)
             return False
 
     def escalate_appeal(self, appeal_id: str, reason: str) -> bool:
@@ -337,19 +493,19 @@ class AppealManager:
                 return False
 
             appeal = self.appeals[appeal_id]
-            appeal.status = AppealStatus.ESCALATED
+            self._set_status(appeal, AppealStatus.ESCALATED)
             appeal.priority = "high"
-            appeal.updated_at = datetime.utcnow().isoformat()
+            appeal.updated_at = now_iso()
             appeal.notes.append({
                 'timestamp': appeal.updated_at,
                 'content': f"Escalated: {reason}"
             })
 
-            logger.info(f"Appeal {appeal_id} escalated")
+            logger.info("Appeal %s escalated", appeal_id)
             return True
 
         except Exception as e:
-            logger.error(f"Error escalating appeal: {str(e)}")
+            logger.error("Error escalating appeal: %s", e)
             return False
 
     def close_appeal(self, appeal_id: str, resolution: str) -> bool:
@@ -359,22 +515,32 @@ class AppealManager:
                 return False
 
             appeal = self.appeals[appeal_id]
-            appeal.status = AppealStatus.CLOSED
+            self._set_status(appeal, AppealStatus.CLOSED)
             appeal.resolution = resolution
-            appeal.updated_at = datetime.utcnow().isoformat()
+            appeal.updated_at = now_iso()
 
-            logger.info(f"Appeal {appeal_id} closed with resolution")
+            logger.info("Appeal %s closed with resolution", appeal_id)
             return True
 
         except Exception as e:
-            logger.error(f"Error closing appeal: {str(e)}")
+            logger.error("Error closing appeal: %s", e)
             return False
 
+    def _set_status(self, appeal: Appeal, status: AppealStatus):
+        """Change an appeal's status and move it between by_status buckets"""
+        # Look up the new bucket first so an unknown status fails untouched
+        bucket = self.by_status[status]
+        if appeal.status is not status:
+            del self.by_status[appeal.status][appeal.appeal_id]
+            bucket[appeal.appeal_id] = None
+            appeal.status = status
+
     def _generate_appeal_id(self) -> str:
         """Generate unique appeal ID"""
-        timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
-        count = len(self.appeals) + 1
-        return f"APP-{timestamp}-{count:04d}"
+        now = int(time.time())
+        if now != self._timestamp_cache[0]:
+            self._timestamp_cache = (now, time.strftime("%Y%m%d%H%M%S", time.gmtime(now)))
+        return f"APP-{self._timestamp_cache[1]}-{next(self._appeal_counter):04d}"
 
 
 class ResponseGenerator:
@@ -390,6 +556,12 @@ class ResponseGenerator:
         'error': "⚠️ Terjadi kesalahan. Silakan coba lagi.",
     }
 
+    # Templates without placeholders; generate_response returns these as-is
+    _STATIC_TEMPLATES = frozenset(
+        key for key, template in TEMPLATES.items()
+        if '{' not in template and '}' not in template
+    )
+
     @staticmethod
     def generate_response(response_type: str, **kwargs) -> str:
         """
@@ -402,9 +574,13 @@ class ResponseGenerator:
         Returns:
             Formatted response string
         """
-        template = ResponseGenerator.TEMPLATES.get(response_type, ResponseGenerator.TEMPLATES['error'])
+        if response_type not in ResponseGenerator.TEMPLATES:
+            response_type = 'error'
+        template = ResponseGenerator.TEMPLATES[response_type]
+        if response_type in ResponseGenerator._STATIC_TEMPLATES:
+            return template
         try:
-            return template.format(**kwargs)
+            return template.format_map(kwargs)
         except KeyError:
             return template
 
@@ -417,43 +593,55 @@ class ResponseGenerator:
 class ConversationState:
     """Manages conversation state for each user"""
 
+    # History entries kept per user; older ones are dropped
+    MAX_HISTORY = 200
+
     def __init__(self):
         self.states: Dict[str, Dict] = {}
 
-    def initialize_state(self, user_id: str) -> None:
-        """Initialize conversation state for user"""
-        self.states[user_id] = {
+    def initialize_state(self, user_id: str) -> Dict:
+        """Initialize conversation state for user and return it"""
+        state = {
             'current_step': 'menu',
             'appeal_draft': {},
-            'last_action': datetime.utcnow().isoformat(),
-            'conversation_history': []
+            'last_action': now_iso(),
+            'conversation_history': deque(maxlen=self.MAX_HISTORY)
         }
+        self.states[user_id] = state
+        return state
 
     def get_state(self, user_id: str) -> Dict:
         """Get conversation state for user"""
-        if user_id not in self.states:
-            self.initialize_state(user_id)
-        return self.states[user_id]
+        state = self.states.get(user_id)
+        if state is None:
+            state = self.initialize_state(user_id)
+        return state
 
     def update_state(self, user_id: str, step: str, data: Dict = None) -> None:
         """Update conversation state"""
-        if user_id not in self.states:
-            self.initialize_state(user_id)
-
-        state = self.states[user_id]
+        state = self.get_state(user_id)
         state['current_step'] = step
-        state['last_action'] = datetime.utcnow().isoformat()
+        state['last_action'] = now_iso()
 
         if data:
             state['appeal_draft'].update(data)
 
-    def add_to_history(self, user_id: str, message: str, sender: str = 'user') -> None:
-        """Add message to conversation history"""
-        if user_id not in self.states:
-            self.initialize_state(user_id)
+    def add_to_history(self, user_id: str, message: str, sender: str = 'user',
+                       state: Optional[Dict] = None) -> None:
+        """
+        Add message to conversation history
+        
+        Args:
+            user_id: User ID
+            message: Message text
+            sender: 'user' or 'bot'
+            state: The user's state if the caller already fetched it
+        """
+        if state is None:
+            state = self.get_state(user_id)
 
-        self.states[user_id]['conversation_history'].append({
-            'timestamp': datetime.utcnow().isoformat(),
+        state['conversation_history'].append({
+            'timestamp': now_iso(),
             'sender': sender,
             'message': message
         })
@@ -501,28 +689,27 @@ class BotEngine:
                 self._initialize_user(user_id)
 
             # Update last interaction
-            self.user_profiles[user_id].last_interaction = datetime.utcnow().isoformat()
+            self.user_profiles[user_id].last_interaction = now_iso()
 
             # Extract intent
-            intent, parameters = self.message_handler.extract_intent(message_content)
+            intent, parameters = self.message_handler.process_text(message_content)
 
-            # Get conversation state
+            # Get conversation state and add the message to its history
             state = self.conversation_state.get_state(user_id)
-
-            # Add to history
-            self.conversation_state.add_to_history(user_id, message_content, 'user')
+            self.conversation_state.add_to_history(user_id, message_content, 'user', state)
 
             # Route to appropriate handler
             response = self._route_intent(user_id, intent, message_content, parameters)
 
-            # Add bot response to history
+            # Add bot response to history (re-fetched: the handler may have
+            # cleared the state)
             self.conversation_state.add_to_history(user_id, response, 'bot')
 
-            logger.info(f"Message processed for user {user_id}: intent={intent}")
+            logger.info("Message processed for user %s: intent=%s", user_id, intent)
             return response
 
         except Exception as e:
-            logger.error(f"Error processing message: {str(e)}")
+            logger.error("Error processing message: %s", e)
             return ResponseGenerator.generate_response('error')
 
     def _initialize_user(self, user_id: str) -> None:
@@ -537,18 +724,8 @@ class BotEngine:
     def _route_intent(self, user_id: str, intent: str, message: str, 
                      parameters: Dict) -> str:
         """Route intent to appropriate handler"""
-        handlers = {
-            'create_appeal': self._handle_create_appeal,
-            'check_status': self._handle_check_status,
-            'provide_info': self._handle_provide_info,
-            'escalate': self._handle_escalate,
-            'close_appeal': self._handle_close_appeal,
-            'get_help': self._handle_get_help,
-            'cancel': self._handle_cancel,
-        }
-
-        handler = handlers.get(intent, self._handle_unknown)
-        return handler(user_id, message, parameters)
+        handler = BotEngine._INTENT_DISPATCH.get(intent, BotEngine._handle_unknown)
+        return handler(self, user_id, message, parameters)
 
     def _handle_create_appeal(self, user_id: str, message: str, params: Dict) -> str:
         """Handle appeal creation"""
@@ -585,7 +762,7 @@ class BotEngine:
                 'appeal_created',
                 appeal_id=appeal.appeal_id,
                 category=appeal.category,
-                status=appeal.status.value
+                status=_STATUS_STR[appeal.status]
             )
 
         return ResponseGenerator.generate_response('error')
@@ -603,16 +780,18 @@ class BotEngine:
                 'status_check',
                 appeal_id=appeal.appeal_id,
                 category=appeal.category,
-                status=appeal.status.value,
+                status=_STATUS_STR[appeal.status],
                 updated_at=appeal.updated_at[:10]
             )
 
         # Multiple appeals - show list
-        response = "📊 Daftar Appeal Anda:\n\n"
-        for i, appeal in enumerate(appeals, 1):
-            response += f"{i}. {appeal.appeal_id} - {appeal.status.value}\n"
-        response += "\nReply dengan nomor untuk detail"
-        return response
+        lines = ["📊 Daftar Appeal Anda:\n"]
+        lines.extend(
+            f"{i}. {appeal.appeal_id} - {_STATUS_STR[appeal.status]}"
+            for i, appeal in enumerate(appeals, 1)
+        )
+        lines.append("\nReply dengan nomor untuk detail")
+        return "\n".join(lines)
 
     def _handle_provide_info(self, user_id: str, message: str, params: Dict) -> str:
         """Handle additional information/attachments"""
@@ -660,6 +839,17 @@ class BotEngine:
         """Handle unknown intent"""
         return ResponseGenerator.TEMPLATES['menu'] + "\n\n" + ResponseGenerator.generate_response('invalid_input')
 
+    # Intent -> handler, built once; _route_intent calls these unbound
+    _INTENT_DISPATCH = {
+        'create_appeal': _handle_create_appeal,
+        'check_status': _handle_check_status,
+        'provide_info': _handle_provide_info,
+        'escalate': _handle_escalate,
+        'close_appeal': _handle_close_appeal,
+        'get_help': _handle_get_help,
+        'cancel': _handle_cancel,
+    }
+
 
 # Initialization function
 def initialize_bot() -> BotEngine: